@@ -3,15 +3,39 @@ In-memory Copilot session fetcher.
 
 Connects to the Copilot SDK with a PAT, fetches session metadata + events,
 and returns everything as plain dicts — no disk I/O.
+
+`CopilotSessionLoader` keeps one CopilotClient warm between requests so
+individual session timelines can be loaded lazily, and stops it once idle.
 """
 
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import time
 from typing import Any
 
 from copilot import CopilotClient
 
+# Upper bound on in-flight session.getMessages RPCs during a bulk fetch.
+_MAX_CONCURRENT_FETCHES = 8
+
+
+async def _start_client(token: str) -> CopilotClient:
+    """Start a CopilotClient for *token*, stopping it again if start() fails."""
+    client = CopilotClient({
+        "github_token": token,
+        "use_logged_in_user": False,
+    })
+    try:
+        await client.start()
+    except BaseException:
+        # Best-effort cleanup of a half-started CLI; keep the original error.
+        with contextlib.suppress(Exception):
+            await client.stop()
+        raise
+    return client
+
 
 async def _fetch_sessions(client: CopilotClient) -> list[dict]:
     """Fetch all sessions via the session.list RPC."""
@@ -21,51 +45,178 @@ async def _fetch_sessions(client: CopilotClient) -> list[dict]:
     return sessions
 
 
-async def _fetch_session_events(client: CopilotClient, session_id: str) -> list[dict]:
-    """Fetch the full event timeline for a single session."""
-    try:
+async def _request_session_events(
+    client: CopilotClient,
+    session_id: str,
+    resumed: set[str] | None = None,
+) -> list[dict]:
+    """
+    Fetch the full event timeline for a single session, raising on RPC failure.
+
+    session.getMessages needs the session resumed on *client* first. Pass a
+    *resumed* set that lives as long as the client to skip repeat resumes.
+    A session is only marked resumed after getMessages succeeds, and is
+    unmarked on failure so the next attempt resumes it again.
+    """
+    if resumed is None or session_id not in resumed:
         await client.resume_session(session_id)
+    try:
         result = await client._client.request(
             "session.getMessages", {"sessionId": session_id}
         )
-        return result.get("events", [])
+    except BaseException:
+        if resumed is not None:
+            resumed.discard(session_id)
+        raise
+    if resumed is not None:
+        resumed.add(session_id)
+    return result.get("events", [])
+
+
+async def _fetch_session_events(client: CopilotClient, session_id: str) -> list[dict]:
+    """Fetch the full event timeline for a single session ([] on failure)."""
+    try:
+        return await _request_session_events(client, session_id)
     except Exception:
         return []
 
 
+async def _fetch_all_events(
+    client: CopilotClient,
+    session_ids: list[str],
+) -> dict[str, list[dict]]:
+    """Fetch timelines for many sessions concurrently ([] per failed session)."""
+    sem = asyncio.Semaphore(_MAX_CONCURRENT_FETCHES)
+
+    async def _fetch_one(sid: str) -> list[dict]:
+        async with sem:
+            return await _fetch_session_events(client, sid)
+
+    results = await asyncio.gather(*(_fetch_one(sid) for sid in session_ids))
+    return dict(zip(session_ids, results))
+
+
 async def fetch_copilot_sessions(
     token: str,
     limit: int = 50,
     fetch_all: bool = False,
+    events: bool = True,
 ) -> tuple[list[dict], dict[str, dict]]:
     """
     Fetch Copilot sessions and their events purely in-memory.
 
+    With ``events=False`` only session metadata is listed and the returned
+    session_data_map is empty; timelines can then be loaded on demand.
+
     Returns:
         (sessions_list, session_data_map)
         - sessions_list: list of session metadata dicts
         - session_data_map: { session_id: { ...metadata, events: [...] } }
     """
-    client = CopilotClient({
-        "github_token": token,
-        "use_logged_in_user": False,
-    })
-    await client.start()
+    client = await _start_client(token)
 
     try:
         sessions = await _fetch_sessions(client)
 
         cap = None if fetch_all else limit
         sessions = sessions[:cap] if cap else sessions
+        if not events:
+            return sessions, {}
 
-        session_data: dict[str, dict] = {}
-        for s in sessions:
-            sid = s.get("sessionId")
-            if not sid:
-                continue
-            events = await _fetch_session_events(client, sid)
-            session_data[sid] = {**s, "events": events}
+        with_ids = [s for s in sessions if s.get("sessionId")]
+        events_by_id = await _fetch_all_events(client, [s["sessionId"] for s in with_ids])
+        session_data: dict[str, dict] = {
+            s["sessionId"]: {**s, "events": events_by_id.get(s["sessionId"], [])}
+            for s in with_ids
+        }
 
         return sessions, session_data
     finally:
         await client.stop()
+
+
+class CopilotSessionLoader:
+    """
+    Lazily loads single-session event timelines through a shared CopilotClient.
+
+    The client is started on first use with the token from the most recent
+    fetch and stopped by a background reaper after *idle_timeout* seconds
+    without requests. The token is held only in this object and is dropped
+    by ``reset()`` / ``close()``. Switching tokens waits for in-flight loads
+    to finish before the old client is stopped.
+    """
+
+    def __init__(self, idle_timeout: float = 300.0) -> None:
+        self._idle_timeout = idle_timeout
+        self._token: str | None = None
+        self._client: CopilotClient | None = None
+        self._resumed: set[str] = set()
+        self._lock = asyncio.Lock()
+        self._in_flight = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._last_used = 0.0
+        self._reaper: asyncio.Task | None = None
+
+    @property
+    def configured(self) -> bool:
+        return self._token is not None
+
+    @property
+    def token(self) -> str | None:
+        """The token loads currently run with (read-only; used to scrub errors)."""
+        return self._token
+
+    async def reset(self, token: str | None) -> None:
+        """Switch to *token* (or forget it), stopping any client started with the old one."""
+        async with self._lock:
+            if token != self._token:
+                # Holding the lock blocks new loads; let running ones finish.
+                await self._drained.wait()
+                await self._stop_client()
+            self._token = token
+
+    async def fetch_events(self, session_id: str) -> list[dict]:
+        """Fetch one session's events; raises if no token is configured or the RPC fails."""
+        async with self._lock:
+            if self._token is None:
+                raise LookupError("No Copilot token available. Fetch sessions first.")
+            if self._client is None:
+                self._client = await _start_client(self._token)
+            if self._reaper is None or self._reaper.done():
+                self._reaper = asyncio.create_task(self._reap_idle())
+            client = self._client
+            self._in_flight += 1
+            self._drained.clear()
+
+        try:
+            return await _request_session_events(client, session_id, self._resumed)
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._drained.set()
+            self._last_used = time.monotonic()
+
+    async def close(self) -> None:
+        """Stop the reaper and the client, and drop the token."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        await self.reset(None)
+
+    async def _stop_client(self) -> None:
+        client, self._client = self._client, None
+        self._resumed = set()
+        if client is not None:
+            await client.stop()
+
+    async def _reap_idle(self) -> None:
+        while True:
+            await asyncio.sleep(self._idle_timeout / 2)
+            async with self._lock:
+                if self._client is None:
+                    return
+                idle = time.monotonic() - self._last_used
+                if self._in_flight == 0 and idle >= self._idle_timeout:
+                    await self._stop_client()
+                    return
@@ -1,19 +1,96 @@
 """GitHub API client for fetching workflow runs and artifacts."""
 
+import asyncio
+import hashlib
 import io
-import json
 import zipfile
-from typing import Any
+from datetime import date
+from operator import itemgetter
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any
 
 import httpx
+import orjson
+from cachetools import LRUCache, TTLCache
+
+
+BASE_URL = "https://api.github.com"
+
+# Artifact downloads are buffered in memory up to this size, then spill to disk.
+_ARTIFACT_SPOOL_MAX = 16 * 1024 * 1024
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Preferred JSON payloads inside an artifact zip, matched as basename suffixes in order.
+_JSON_CANDIDATES = ("gatekeeper-consolidated.json", "council-results.json")
+
+# Process-wide response caches. Keys start with a token fingerprint so
+# entries fetched with one PAT are never served to another.
+_workflow_id_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+_workflow_miss_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_runs_cache: TTLCache = TTLCache(maxsize=4096, ttl=15)
+# (scope, owner, repo, run_id) -> {artifact name: artifact id}
+_artifact_index: LRUCache = LRUCache(maxsize=1024)
+# (scope, path, params) -> (etag, parsed body) for If-None-Match revalidation.
+# Bodies are held raw (up to 100-run listings), so keep this small and short-lived.
+_etag_cache: TTLCache = TTLCache(maxsize=256, ttl=300)
+
+# Run fields copied verbatim into the API's run summaries.
+_RUN_FIELDS = (
+    "id",
+    "status",
+    "conclusion",
+    "created_at",
+    "updated_at",
+    "html_url",
+    "display_title",
+    "run_number",
+)
+_get_run_fields = itemgetter(*_RUN_FIELDS)
+
+
+def _project_run(r: dict, include_workflow_name: bool = False) -> dict:
+    """Shape a raw GitHub workflow run into the summary dict served by the API."""
+    out = dict(zip(_RUN_FIELDS, _get_run_fields(r)))
+    out["head_sha"] = r["head_sha"][:7]
+    if include_workflow_name:
+        out["workflow_name"] = r.get("name", "Unknown")
+    actor = r.get("actor") or {}
+    out["actor"] = actor.get("login", "unknown")
+    out["actor_avatar"] = actor.get("avatar_url", "")
+    return out
+
+
+def token_fingerprint(token: str) -> str:
+    """Short, non-reversible id for a token, safe to use in cache keys and logs."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def make_http_client() -> httpx.AsyncClient:
+    """Build the pooled AsyncClient shared by all GitHubClient instances.
+
+    HTTP/2 is negotiated via ALPN, so concurrent requests multiplex over one
+    connection when the server supports it and fall back to HTTP/1.1 otherwise.
+    """
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=60.0,
+    )
 
 
 class GitHubClient:
     """Thin wrapper around the GitHub REST API."""
 
-    BASE = "https://api.github.com"
+    BASE = BASE_URL
 
-    def __init__(self, token: str, owner: str, repo: str) -> None:
+    def __init__(
+        self,
+        token: str,
+        owner: str,
+        repo: str,
+        http: httpx.AsyncClient | None = None,
+    ) -> None:
         self.owner = owner
         self.repo = repo
         # Use 'token' prefix for classic PATs (ghp_), 'Bearer' for fine-grained (github_pat_)
@@ -23,14 +100,15 @@ class GitHubClient:
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28",
         }
-        self._client = httpx.AsyncClient(
-            base_url=self.BASE,
-            headers=self.headers,
-            timeout=60.0,
-        )
+        self._cache_scope = token_fingerprint(token)
+        # Auth headers are sent per request so a shared, pooled client can
+        # serve many tokens; only a client we created ourselves is closed.
+        self._owns_client = http is None
+        self._client = http if http is not None else make_http_client()
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._owns_client:
+            await self._client.aclose()
 
     # ── helpers ──────────────────────────────────────────────
 
@@ -38,7 +116,16 @@ class GitHubClient:
         return f"/repos/{self.owner}/{self.repo}"
 
     async def _get_json(self, path: str, params: dict | None = None) -> Any:
-        r = await self._client.get(path, params=params)
+        key = (self._cache_scope, path, tuple(sorted((params or {}).items())))
+        cached = _etag_cache.get(key)
+        headers = self.headers
+        if cached is not None:
+            headers = {**self.headers, "If-None-Match": cached[0]}
+
+        r = await self._client.get(path, params=params, headers=headers)
+        if r.status_code == 304 and cached is not None:
+            # Not Modified: reuse the parsed body (and GitHub doesn't charge rate limit)
+            return cached[1]
         if r.status_code == 401:
             raise PermissionError("Invalid token — check that your PAT is correct and not expired.")
         if r.status_code == 403:
@@ -52,7 +139,11 @@ class GitHubClient:
                 f"Repository not found or not accessible with this token."
             )
         r.raise_for_status()
-        return r.json()
+        data = orjson.loads(r.content)
+        etag = r.headers.get("ETag")
+        if etag:
+            _etag_cache[key] = (etag, data)
+        return data
 
     # ── public API ───────────────────────────────────────────
 
@@ -61,40 +152,55 @@ class GitHubClient:
         return await self._get_json(f"{self._repo_prefix()}")
 
     async def get_workflow_id(self, workflow_name: str = "Gatekeeper Analysis") -> int | None:
-        """Find the workflow ID by name."""
+        """Find the workflow ID by name (cached for an hour, misses for a minute)."""
+        key = (self._cache_scope, self.owner, self.repo, workflow_name)
+        wf_id = _workflow_id_cache.get(key)
+        if wf_id is not None:
+            return wf_id
+        if key in _workflow_miss_cache:
+            return None
+
         data = await self._get_json(f"{self._repo_prefix()}/actions/workflows")
         for wf in data.get("workflows", []):
             if wf["name"] == workflow_name:
+                _workflow_id_cache[key] = wf["id"]
                 return wf["id"]
+        _workflow_miss_cache[key] = True
         return None
 
     async def get_runs(
         self,
         workflow_id: int,
         per_page: int = 10,
+        since: date | None = None,
+        head_sha: str | None = None,
     ) -> list[dict]:
-        """Return the latest *per_page* completed runs."""
+        """Return the latest *per_page* completed runs (cached for 15 seconds).
+
+        *since* (runs created on or after that date) and *head_sha* are applied
+        server-side by GitHub.
+        A time-windowed query fetches the maximum page of 100 runs.
+        """
+        params: dict[str, Any] = {"per_page": per_page, "status": "completed"}
+        if since:
+            params["created"] = f">={since.isoformat()}"
+            params["per_page"] = 100
+        if head_sha:
+            params["head_sha"] = head_sha
+
+        key = (self._cache_scope, self.owner, self.repo, workflow_id, tuple(sorted(params.items())))
+        cached = _runs_cache.get(key)
+        if cached is not None:
+            return cached
+
         data = await self._get_json(
             f"{self._repo_prefix()}/actions/workflows/{workflow_id}/runs",
-            params={"per_page": per_page, "status": "completed"},
+            params=params,
         )
         runs = data.get("workflow_runs", [])
-        return [
-            {
-                "id": r["id"],
-                "status": r["status"],
-                "conclusion": r["conclusion"],
-                "created_at": r["created_at"],
-                "updated_at": r["updated_at"],
-                "html_url": r["html_url"],
-                "head_sha": r["head_sha"][:7],
-                "display_title": r["display_title"],
-                "run_number": r["run_number"],
-                "actor": r.get("actor", {}).get("login", "unknown"),
-                "actor_avatar": r.get("actor", {}).get("avatar_url", ""),
-            }
-            for r in runs
-        ]
+        result = [_project_run(r) for r in runs]
+        _runs_cache[key] = result
+        return result
 
     async def get_all_runs(self, per_page: int = 10) -> list[dict]:
         """Return latest runs for ALL workflow types, not just Gatekeeper Analysis."""
@@ -103,23 +209,7 @@ class GitHubClient:
             params={"per_page": per_page},
         )
         runs = data.get("workflow_runs", [])
-        return [
-            {
-                "id": r["id"],
-                "status": r["status"],
-                "conclusion": r["conclusion"],
-                "created_at": r["created_at"],
-                "updated_at": r["updated_at"],
-                "html_url": r["html_url"],
-                "head_sha": r["head_sha"][:7],
-                "display_title": r["display_title"],
-                "run_number": r["run_number"],
-                "workflow_name": r.get("name", "Unknown"),
-                "actor": r.get("actor", {}).get("login", "unknown"),
-                "actor_avatar": r.get("actor", {}).get("avatar_url", ""),
-            }
-            for r in runs
-        ]
+        return [_project_run(r, include_workflow_name=True) for r in runs]
 
     async def get_artifact(
         self,
@@ -127,59 +217,90 @@ class GitHubClient:
         artifact_name: str = "gatekeeper-final-analysis",
     ) -> dict | None:
         """Download the ZIP artifact and extract the consolidated JSON."""
-        # 1. list artifacts for the run
-        data = await self._get_json(
-            f"{self._repo_prefix()}/actions/runs/{run_id}/artifacts"
-        )
-        artifact_id: int | None = None
-        available: list[str] = []
-        for a in data.get("artifacts", []):
-            available.append(a["name"])
-            if a["name"] == artifact_name:
-                artifact_id = a["id"]
-                break
+        # 1. resolve the artifact id, listing the run's artifacts only on a cache miss.
+        # Uploaded artifacts are immutable, but a run may still be adding new ones,
+        # so a listing without the requested name is refreshed rather than trusted.
+        key = (self._cache_scope, self.owner, self.repo, run_id)
+        names = _artifact_index.get(key)
+        if names is None or artifact_name not in names:
+            data = await self._get_json(
+                f"{self._repo_prefix()}/actions/runs/{run_id}/artifacts",
+                params={"per_page": 100},
+            )
+            names = {a["name"]: a["id"] for a in data.get("artifacts", [])}
+            _artifact_index[key] = names
 
+        artifact_id = names.get(artifact_name)
         if artifact_id is None:
-            return {"error": f"Artifact '{artifact_name}' not found", "available": available}
+            return {"error": f"Artifact '{artifact_name}' not found", "available": list(names)}
 
-        # 2. download zip
-        r = await self._client.get(
-            f"{self._repo_prefix()}/actions/artifacts/{artifact_id}/zip",
-            follow_redirects=True,
-        )
-        r.raise_for_status()
+        # 2. stream zip download into a spooled buffer
+        with SpooledTemporaryFile(max_size=_ARTIFACT_SPOOL_MAX) as buf:
+            async with self._client.stream(
+                "GET",
+                f"{self._repo_prefix()}/actions/artifacts/{artifact_id}/zip",
+                headers=self.headers,
+                follow_redirects=True,
+            ) as r:
+                r.raise_for_status()
+                async for chunk in r.aiter_bytes(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                    buf.write(chunk)
+            buf.seek(0)
 
-        # 3. extract JSON from zip
-        zf = zipfile.ZipFile(io.BytesIO(r.content))
-        json_candidates = ["gatekeeper-consolidated.json", "council-results.json"]
+            # 3. extract JSON from zip (CPU-bound, so keep it off the event loop)
+            return await asyncio.to_thread(self._extract_artifact_json, buf)
 
-        for candidate in json_candidates:
-            # search flat & nested
-            for name in zf.namelist():
-                if name.endswith(candidate):
-                    result = json.loads(zf.read(name))
-                    # Also look for cast-impact-analysis markdown and merge it in
-                    result = self._merge_cast_impact(zf, result)
-                    return result
+    @classmethod
+    def _extract_artifact_json(cls, buf: IO[bytes]) -> dict:
+        """Pick the artifact's JSON payload out of a zip file object and parse it (blocking)."""
+        with zipfile.ZipFile(buf) as zf:
+            index = cls._index_zip(zf)
+            # search flat & nested: first member whose basename ends with each candidate
+            matches: dict[str, zipfile.ZipInfo] = {}
+            for base, zi in index.items():
+                for c in _JSON_CANDIDATES:
+                    if base.endswith(c):
+                        matches.setdefault(c, zi)
+            member = next((matches[c] for c in _JSON_CANDIDATES if c in matches), None)
+            if member is None:
+                # fallback: any .json
+                member = next(
+                    (zi for base, zi in index.items() if base.endswith(".json")),
+                    None,
+                )
+            if member is None:
+                return {"error": "No JSON found in artifact"}
 
-        # fallback: any .json
-        for name in zf.namelist():
-            if name.endswith(".json"):
-                result = json.loads(zf.read(name))
-                result = self._merge_cast_impact(zf, result)
-                return result
+            # Only the download is bounded (by the spool); the chosen JSON member
+            # is still read into memory whole, since orjson parses complete documents.
+            with zf.open(member) as fp:
+                result = orjson.loads(fp.read())
+            # Also look for cast-impact-analysis markdown and merge it in
+            return cls._merge_cast_impact(zf, index, result)
 
-        return {"error": "No JSON found in artifact"}
+    @staticmethod
+    def _index_zip(zf: zipfile.ZipFile) -> dict[str, zipfile.ZipInfo]:
+        """Map each member's basename to its ZipInfo (first occurrence wins), in one pass."""
+        index: dict[str, zipfile.ZipInfo] = {}
+        for zi in zf.infolist():
+            if not zi.is_dir():
+                index.setdefault(zi.filename.rsplit("/", 1)[-1], zi)
+        return index
 
     @staticmethod
-    def _merge_cast_impact(zf: zipfile.ZipFile, result: dict) -> dict:
+    def _merge_cast_impact(
+        zf: zipfile.ZipFile,
+        index: dict[str, zipfile.ZipInfo],
+        result: dict,
+    ) -> dict:
         """If the zip contains a cast-impact-analysis file, merge its markdown content into the result dict."""
-        for name in zf.namelist():
-            basename = name.rsplit("/", 1)[-1] if "/" in name else name
+        for basename, zi in index.items():
             if basename.startswith("cast-impact-analysis"):
                 try:
-                    content = zf.read(name).decode("utf-8", errors="replace")
-                    result["cast_impact_analysis"] = content
+                    with zf.open(zi) as fp:
+                        result["cast_impact_analysis"] = io.TextIOWrapper(
+                            fp, encoding="utf-8", errors="replace"
+                        ).read()
                 except Exception:
                     pass
                 break
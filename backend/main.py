@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import os
 import re
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import date
 from pathlib import Path
 from typing import Any
 
+import orjson
+from cachetools import LRUCache
 from dotenv import load_dotenv
 
 # Load .env from the project root (works both locally and inside Docker)
@@ -20,23 +25,47 @@ logger = logging.getLogger(__name__)
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from pydantic import BaseModel
 
 try:
-    from github_client import GitHubClient
-    from copilot_fetcher import fetch_copilot_sessions
+    from github_client import GitHubClient, make_http_client, token_fingerprint
+    from copilot_fetcher import CopilotSessionLoader, fetch_copilot_sessions
 except ImportError:
-    from backend.github_client import GitHubClient
-    from backend.copilot_fetcher import fetch_copilot_sessions
+    from backend.github_client import GitHubClient, make_http_client, token_fingerprint
+    from backend.copilot_fetcher import CopilotSessionLoader, fetch_copilot_sessions
 
-app = FastAPI(title="Gatekeeper Viewer API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own one pooled HTTP client for the process so GitHub connections are reused."""
+    async with AsyncExitStack() as stack:
+        stack.push_async_callback(_session_loader.close)
+        app.state.http = await stack.enter_async_context(make_http_client())
+        yield
+
+
+app = FastAPI(
+    title="Gatekeeper Viewer API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # ── in-memory session store (populated via /api/sessions/fetch) ──
+# Fetched timelines are loaded lazily into a bounded LRU and can be re-fetched
+# after eviction; uploaded timelines can't, so they are kept in a plain dict.
+# Timelines are stored pre-serialized (orjson bytes) so get_session serves them
+# without re-encoding. All access happens on the event loop thread, so no
+# extra locking is needed.
+_SESSION_CACHE_SIZE = 500
+
 _session_store: dict[str, Any] = {
     "sessions": [],       # list of session metadata
-    "session_data": {},   # session_id -> full session data with events
+    "index": {},          # session_id -> session metadata
+    "session_data": {},   # session_id -> JSON bytes of full session data with events
 }
+_session_loader = CopilotSessionLoader()
 
 app.add_middleware(
     CORSMiddleware,
@@ -78,20 +107,33 @@ class RunSummary(BaseModel):
 # ── helpers ──────────────────────────────────────────────────
 
 _GITHUB_URL_RE = re.compile(
-    r"(?:https?://)?(?:www\.)?github\.com/([A-Za-z0-9_.-]+)/([A-Za-z0-9_.-]+)(?:\.git)?/?$"
+    r"(?:https?://)?(?:www\.)?github\.com/([\w.-]+)/([\w.-]+?)(?:\.git)?/?",
+    re.ASCII,
 )
 
 
+@functools.lru_cache(maxsize=1024)
 def parse_github_url(url: str) -> tuple[str, str]:
     """Extract (owner, repo) from a GitHub URL."""
-    m = _GITHUB_URL_RE.match(url.strip())
+    m = _GITHUB_URL_RE.fullmatch(url.strip())
     if not m:
         raise ValueError(f"Invalid GitHub URL: {url}")
     return m.group(1), m.group(2)
 
 
+# GitHub token formats: classic/fine-grained PATs, OAuth, user-to-server, server, refresh.
+_TOKEN_RE = re.compile(r"(?:ghp_|github_pat_|gho_|ghu_|ghs_|ghr_)[A-Za-z0-9_]{20,}")
+
+
+def _scrub_tokens(text: str, token: str | None = None) -> str:
+    """Mask *token* and anything else that looks like a GitHub token before it reaches a client or a log."""
+    if token:
+        text = text.replace(token, "***")
+    return _TOKEN_RE.sub("***", text)
+
+
 def _make_client(owner: str, repo: str, token: str) -> GitHubClient:
-    return GitHubClient(token=token, owner=owner, repo=repo)
+    return GitHubClient(token=token, owner=owner, repo=repo, http=app.state.http)
 
 
 # ── endpoints ────────────────────────────────────────────────
@@ -113,8 +155,6 @@ async def connect(body: ConnectRequest) -> Any:
         raise HTTPException(status_code=404, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=401, detail=f"GitHub API error: {exc}")
-    finally:
-        await client.close()
 
     return ConnectResponse(
         owner=owner,
@@ -132,19 +172,18 @@ async def list_runs(
     token: str,
     workflow_name: str = "Gatekeeper Analysis",
     per_page: int = 10,
+    since: date | None = None,
+    head_sha: str | None = None,
 ) -> list[dict]:
     """Return the latest workflow runs for the given workflow name."""
     client = _make_client(owner, repo, token)
-    try:
-        wf_id = await client.get_workflow_id(workflow_name)
-        if wf_id is None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Workflow '{workflow_name}' not found in {owner}/{repo}",
-            )
-        return await client.get_runs(wf_id, per_page=per_page)
-    finally:
-        await client.close()
+    wf_id = await client.get_workflow_id(workflow_name)
+    if wf_id is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Workflow '{workflow_name}' not found in {owner}/{repo}",
+        )
+    return await client.get_runs(wf_id, per_page=per_page, since=since, head_sha=head_sha)
 
 
 @app.get("/api/runs/{run_id}/artifact")
@@ -157,15 +196,12 @@ async def get_run_artifact(
 ) -> Any:
     """Download and return the JSON artifact for a specific run."""
     client = _make_client(owner, repo, token)
-    try:
-        result = await client.get_artifact(run_id, artifact_name)
-        if result is None:
-            raise HTTPException(status_code=404, detail="Artifact not found")
-        if "error" in result and "available" in result:
-            raise HTTPException(status_code=404, detail=result)
-        return result
-    finally:
-        await client.close()
+    result = await client.get_artifact(run_id, artifact_name)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    if "error" in result and "available" in result:
+        raise HTTPException(status_code=404, detail=result)
+    return result
 
 
 # ── Feature Requirement Analysis (FRD) endpoints ────────────
@@ -177,19 +213,18 @@ async def list_frd_runs(
     token: str,
     workflow_name: str = "Feature Requirement Analysis",
     per_page: int = 10,
+    since: date | None = None,
+    head_sha: str | None = None,
 ) -> list[dict]:
     """Return the latest workflow runs for the Feature Requirement Analysis workflow."""
     client = _make_client(owner, repo, token)
-    try:
-        wf_id = await client.get_workflow_id(workflow_name)
-        if wf_id is None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Workflow '{workflow_name}' not found in {owner}/{repo}",
-            )
-        return await client.get_runs(wf_id, per_page=per_page)
-    finally:
-        await client.close()
+    wf_id = await client.get_workflow_id(workflow_name)
+    if wf_id is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Workflow '{workflow_name}' not found in {owner}/{repo}",
+        )
+    return await client.get_runs(wf_id, per_page=per_page, since=since, head_sha=head_sha)
 
 
 @app.get("/api/frd/runs/{run_id}/artifact")
@@ -202,15 +237,12 @@ async def get_frd_run_artifact(
 ) -> Any:
     """Download and return the JSON artifact for a Feature Requirement Analysis run."""
     client = _make_client(owner, repo, token)
-    try:
-        result = await client.get_artifact(run_id, artifact_name)
-        if result is None:
-            raise HTTPException(status_code=404, detail="Artifact not found")
-        if "error" in result and "available" in result:
-            raise HTTPException(status_code=404, detail=result)
-        return result
-    finally:
-        await client.close()
+    result = await client.get_artifact(run_id, artifact_name)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    if "error" in result and "available" in result:
+        raise HTTPException(status_code=404, detail=result)
+    return result
 
 
 # ── Copilot session endpoints ────────────────────────────────
@@ -229,19 +261,22 @@ class SessionUploadRequest(BaseModel):
 @app.post("/api/sessions/fetch")
 async def fetch_sessions_endpoint(body: SessionFetchRequest) -> dict:
     """Fetch Copilot sessions using the supplied PAT — purely in-memory, no disk I/O."""
+    logger.info("Fetching Copilot sessions with token %s", token_fingerprint(body.token))
     try:
-        sessions, session_data = await fetch_copilot_sessions(
+        sessions, _ = await fetch_copilot_sessions(
             token=body.token,
             limit=body.limit,
             fetch_all=body.fetch_all,
+            events=False,
         )
     except Exception as exc:
-        # Scrub the token from error messages
-        err = str(exc).replace(body.token, "***")
-        raise HTTPException(status_code=500, detail=f"Fetch failed: {err}")
+        raise HTTPException(status_code=500, detail=f"Fetch failed: {_scrub_tokens(str(exc), body.token)}")
 
+    # Event timelines are loaded on first access by get_session.
+    await _session_loader.reset(body.token)
     _session_store["sessions"] = sessions
-    _session_store["session_data"] = session_data
+    _session_store["index"] = {s["sessionId"]: s for s in sessions if s.get("sessionId")}
+    _session_store["session_data"] = LRUCache(maxsize=_SESSION_CACHE_SIZE)
 
     return {
         "count": len(sessions),
@@ -260,8 +295,12 @@ async def upload_sessions(body: SessionUploadRequest) -> dict:
     if not body.sessions:
         raise HTTPException(status_code=400, detail="No session metadata provided")
 
+    await _session_loader.reset(None)
     _session_store["sessions"] = body.sessions
-    _session_store["session_data"] = body.session_data
+    _session_store["index"] = {}
+    _session_store["session_data"] = await asyncio.to_thread(
+        lambda: {sid: orjson.dumps(data) for sid, data in body.session_data.items()}
+    )
 
     return {
         "count": len(body.sessions),
@@ -277,12 +316,34 @@ async def list_sessions() -> list[dict]:
 
 
 @app.get("/api/sessions/{session_id}")
-async def get_session(session_id: str) -> dict:
-    """Return full session data including events for a specific session."""
-    data = _session_store["session_data"].get(session_id)
-    if data is None:
+async def get_session(session_id: str) -> Response:
+    """Return full session data including events, loading the timeline on first access."""
+    # Bind the current store: a fetch/upload may replace it while we await the
+    # loader, and a stale timeline must not land in the new one.
+    store = _session_store["session_data"]
+    data = store.get(session_id)
+    if data is not None:
+        return Response(content=data, media_type="application/json")
+
+    meta = _session_store["index"].get(session_id)
+    if meta is None or not _session_loader.configured:
         raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found. Fetch sessions first.")
-    return data
+
+    # Captured before the await so a concurrent token switch can't leave it unscrubbed.
+    token = _session_loader.token
+    try:
+        events = await _session_loader.fetch_events(session_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except Exception as exc:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Could not load events for session '{session_id}': {_scrub_tokens(str(exc), token)}",
+        )
+
+    data = orjson.dumps({**meta, "events": events})
+    store[session_id] = data
+    return Response(content=data, media_type="application/json")
 
 
 # ── Agentic Analysis endpoints ───────────────────────────────
@@ -27,10 +27,13 @@ Output:
 
 import argparse
 import asyncio
-import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from pathlib import Path
+
+import orjson
 from copilot import CopilotClient
 
 # Output directory (relative to this script)
@@ -74,8 +77,7 @@ async def fetch_session_events(client: CopilotClient, session_id: str) -> list:
 
 
 def dump_json(path: str, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, default=str, ensure_ascii=False)
+    Path(path).write_bytes(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2))
 
 
 async def main():
@@ -130,18 +132,24 @@ async def main():
         print(f"[OK] Wrote {sessions_path} ({len(display)} sessions)")
 
         # ── Write individual session event files ─────────────
+        # Files are serialized and written on worker threads while the next
+        # session's events are being fetched.
         if not args.list_only:
-            for i, s in enumerate(display, 1):
-                sid = s.get("sessionId", "unknown")
-                print(f"  [{i}/{len(display)}] Fetching events for {sid}...")
-                events = await fetch_session_events(client, sid)
-                session_data = {
-                    **s,
-                    "events": events,
-                }
-                out_path = os.path.join(SESSIONS_DIR, f"{sid}.json")
-                dump_json(out_path, session_data)
-        print(f"    [OK] {len(events)} events -> {out_path}")
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                writes = []
+                for i, s in enumerate(display, 1):
+                    sid = s.get("sessionId", "unknown")
+                    print(f"  [{i}/{len(display)}] Fetching events for {sid}...")
+                    events = await fetch_session_events(client, sid)
+                    session_data = {
+                        **s,
+                        "events": events,
+                    }
+                    out_path = os.path.join(SESSIONS_DIR, f"{sid}.json")
+                    writes.append(pool.submit(dump_json, out_path, session_data))
+                    print(f"    [OK] {len(events)} events -> {out_path}")
+                for w in writes:
+                    w.result()
 
         print("\nDone!")
 